@@ -1,11 +1,17 @@
+import functools
 import hashlib
 import os
+import pickle
+import threading
 import json
 import uuid
-import tempfile
+import io
+import types
+import zlib
+import numpy as np
 from flask import render_template, request, jsonify, session, send_file, redirect, url_for
 from app import app
-from .transliteration import transliterate_chapter, count_strongs_in_verses, get_verses_by_book
+from .transliteration import transliterate_chapter, extract_strongs_numbers
 
 # Paths
 current_file_path = os.path.abspath(__file__)
@@ -13,12 +19,12 @@ current_dir = os.path.dirname(current_file_path)
 STATIC_DATA_DIR = os.path.join(current_dir, 'static')
 UPLOAD_DATA_DIR = os.path.join(current_dir, 'uploads')
 os.makedirs(UPLOAD_DATA_DIR, exist_ok=True)
-
-def get_session_id():
-    if 'user_id' not in session:
-        session['user_id'] = str(uuid.uuid4())
-    return session['user_id']
-
+
+def get_session_id():
+    if 'user_id' not in session:
+        session['user_id'] = str(uuid.uuid4())
+    return session['user_id']
+
 def _validate_user_dict(data):
     if not isinstance(data, dict):
         return False, "Uploaded JSON must be an object mapping Strong's numbers to entries."
@@ -41,84 +47,291 @@ def _user_dict_path():
     return os.path.join(UPLOAD_DATA_DIR, f"{get_session_id()}.json")
 
 
+# Server-side store of user dicts keyed by session id. The cookie only
+# carries the id; the authoritative copy lives here, backed by the per-user
+# JSON file on disk (which also covers cache misses in other workers).
+_user_dict_cache = {}
+_user_dict_cache_lock = threading.Lock()
+
+
+def _apply_overrides(overrides: dict) -> dict:
+    merged = _default_user_dict_copy()
+    for k, v in overrides.items():
+        if v is None:
+            merged.pop(k, None)
+        else:
+            merged[k] = v
+    return merged
+
+
 def save_user_dict(user_dict: dict):
-    session['user_strongs_dict'] = user_dict
+    with _user_dict_cache_lock:
+        _user_dict_cache[get_session_id()] = user_dict
+    path = _user_dict_path()
+    tmp_path = path + '.tmp'
     try:
-        with open(_user_dict_path(), 'w', encoding='utf-8') as f:
-            json.dump(user_dict, f, ensure_ascii=False, indent=2)
+        # Write-then-rename so a crash mid-write can never leave a truncated
+        # dict behind; os.replace is atomic on the same filesystem.
+        with open(tmp_path, 'wb') as f:
+            f.write(_dump_json_bytes(user_dict))
+        os.replace(tmp_path, path)
     except OSError:
-        # If persisting to disk fails, we still keep the session copy.
+        # If persisting to disk fails, we still keep the in-process copy.
         pass
 
 
+def _default_user_dict_copy():
+    # Fresh per-session copy so edits never mutate the shared template.
+    return {
+        k: {"translations": list(v["translations"]), "color": v["color"]}
+        for k, v in _DEFAULT_USER_STRONGS.items()
+    }
+
+
 def get_user_strongs_dict():
-    default_dict = {k: {"translations": v, "color": None} for k, v in default_strongs_dict.items()}
-    if 'user_strongs_dict' in session:
-        return session['user_strongs_dict']
+    user_id = get_session_id()
+    with _user_dict_cache_lock:
+        cached = _user_dict_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    # Fold dicts from legacy cookies (full copy or overrides diff) into the
+    # server-side store and drop them from the cookie.
+    legacy = session.pop('user_strongs_dict', None)
+    if legacy is None:
+        overrides = session.pop('user_strongs_overrides', None)
+        if overrides is not None:
+            legacy = _apply_overrides(overrides)
+    if isinstance(legacy, dict) and legacy:
+        save_user_dict(legacy)
+        return legacy
 
     user_file = _user_dict_path()
     if os.path.exists(user_file):
         try:
-            with open(user_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _load_json(user_file)
             valid, _ = _validate_user_dict(data)
             if valid:
-                session['user_strongs_dict'] = data
+                with _user_dict_cache_lock:
+                    _user_dict_cache[user_id] = data
                 return data
-        except (OSError, json.JSONDecodeError):
+        except (OSError, ValueError):
             pass
 
-    session['user_strongs_dict'] = default_dict
+    default_dict = _default_user_dict_copy()
+    with _user_dict_cache_lock:
+        _user_dict_cache[user_id] = default_dict
     return default_dict
-
+
 strongs_dict_path = os.path.join(STATIC_DATA_DIR, 'strongs_dict.json')
 strongs_path = os.path.join(STATIC_DATA_DIR, 'Strongs.json')
 kjv_path = os.path.join(STATIC_DATA_DIR, 'kjv_strongs.json')
-outlines_path = os.path.abspath(os.path.join(current_dir, '..', 'bible_bsb_book_outlines_with_ranges.json'))
-
-with open(strongs_dict_path, 'r', encoding='utf-8') as f:
-    default_strongs_dict = json.load(f)
-with open(strongs_path, 'r', encoding='utf-8') as f:
-    strongs_data = json.load(f)
-with open(kjv_path, 'r', encoding='utf-8') as f:
-    kjv_data = json.load(f)
-with open(outlines_path, 'r', encoding='utf-8') as f:
-    outline_data = json.load(f)
-
-# Build mappings for book order and chapter counts
-book_order = {}
-book_chapter_count = {}
-chapter_verse_counts = {}
-for verse in kjv_data.get('verses', []):
-    name = verse['book_name']
-    if name not in book_order:
-        book_order[name] = verse['book']
-    chapter = int(verse['chapter'])
-    if name not in book_chapter_count or chapter > book_chapter_count[name]:
-        book_chapter_count[name] = chapter
-    chapter_verse_counts.setdefault(name, {})
-    chapter_verse_counts[name][chapter] = max(int(verse['verse']), chapter_verse_counts[name].get(chapter, 0))
-
-
-def _get_unit_color(unit: dict) -> str:
-    seed = f"{unit.get('marker', '')}-{unit.get('title', '')}"
-    digest = hashlib.md5(seed.encode('utf-8')).hexdigest()
-    return f"#{digest[:6]}"
-
-
-def _count_verses_in_range(book: str, start_chapter: int, start_verse: int, end_chapter: int, end_verse: int) -> int:
-    total = 0
-    chapter_counts = chapter_verse_counts.get(book, {})
-    for ch in range(start_chapter, end_chapter + 1):
-        max_verse = chapter_counts.get(ch, 0)
-        if not max_verse:
-            continue
-        range_start = start_verse if ch == start_chapter else 1
-        range_end = end_verse if ch == end_chapter else max_verse
-        total += max(0, range_end - range_start + 1)
-    return total
-
-
+outlines_path = os.path.abspath(os.path.join(current_dir, '..', 'bible_bsb_book_outlines_with_ranges.json'))
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    orjson = None
+
+
+def _load_json(path):
+    # Read the whole file as bytes in one shot; the parser handles the UTF-8
+    # decode itself, which is faster than line-buffered text-mode reads for
+    # the multi-megabyte static blobs loaded here.
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dump_json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+default_strongs_dict = _load_json(strongs_dict_path)
+strongs_data = _load_json(strongs_path)
+kjv_data = _load_json(kjv_path)
+outline_data = _load_json(outlines_path)
+
+# Template for a fresh user dict, built once instead of per request.
+_DEFAULT_USER_STRONGS = {
+    k: {"translations": v, "color": None} for k, v in default_strongs_dict.items()
+}
+
+
+@functools.lru_cache(maxsize=16384)
+def _strongs_sort_key(strong_number: str) -> int:
+    return int(strong_number[1:])
+
+
+_DEFAULT_SORTED_KEYS = sorted(default_strongs_dict, key=_strongs_sort_key)
+
+def _build_kjv_indices():
+    """Build the derived KJV lookup tables in one pass over the verses.
+
+    Covers book order and chapter counts, the reverse index
+    strong_number -> book -> chapter -> count (so heatmap generation never
+    rescans the full verse list), and per-book verse-count arrays with
+    prefix sums.
+    """
+    book_order = {}
+    chapter_verse_counts = {}
+    strong_index = {}
+    strong_max_count = {}
+    for verse in kjv_data.get('verses', []):
+        name = verse['book_name']
+        book_counts = chapter_verse_counts.get(name)
+        if book_counts is None:
+            book_counts = chapter_verse_counts[name] = {}
+            book_order[name] = verse['book']
+        chapter = int(verse['chapter'])
+        verse_num = int(verse['verse'])
+        if verse_num > book_counts.get(chapter, 0):
+            book_counts[chapter] = verse_num
+        for strong in extract_strongs_numbers(verse['text']):
+            book_counts = strong_index.get(strong)
+            if book_counts is None:
+                book_counts = strong_index[strong] = {}
+            chapter_counts = book_counts.get(name)
+            if chapter_counts is None:
+                chapter_counts = book_counts[name] = {}
+            count = chapter_counts.get(chapter, 0) + 1
+            chapter_counts[chapter] = count
+            if count > strong_max_count.get(strong, 0):
+                strong_max_count[strong] = count
+
+    # Verses arrive in canonical order, so the highest chapter per book is
+    # just the max key of its count table — no per-verse comparisons needed.
+    book_chapter_count = {name: max(counts) for name, counts in chapter_verse_counts.items()}
+
+    # Per-book verse counts as int32 arrays indexed by chapter (index 0
+    # unused), plus prefix sums: cumulative_verses[book][ch] is the total
+    # number of verses in chapters 1..ch, so range counts need no loop.
+    cumulative_verses = {}
+    for name, counts in chapter_verse_counts.items():
+        arr = np.zeros(book_chapter_count.get(name, 0) + 1, dtype=np.int32)
+        for ch, max_v in counts.items():
+            arr[ch] = max_v
+        chapter_verse_counts[name] = arr
+        cumulative_verses[name] = np.concatenate(([0], np.cumsum(arr[1:], dtype=np.int64)))
+
+    return {
+        'book_order': book_order,
+        'book_chapter_count': book_chapter_count,
+        'chapter_verse_counts': chapter_verse_counts,
+        'cumulative_verses': cumulative_verses,
+        'strong_index': strong_index,
+        'strong_max_count': strong_max_count,
+    }
+
+
+_INDEX_CACHE_PATH = os.path.join(STATIC_DATA_DIR, 'kjv_indices.cache.pkl')
+
+
+def _load_kjv_indices():
+    """Load the derived tables from the pickle cache, rebuilding when stale.
+
+    The cache is keyed on the mtime of kjv_strongs.json (the only source
+    the tables derive from), so editing the source invalidates it.
+    """
+    cache_key = os.path.getmtime(kjv_path)
+    try:
+        with open(_INDEX_CACHE_PATH, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('cache_key') == cache_key:
+            return cached['indices']
+    except (OSError, pickle.PickleError, EOFError, KeyError):
+        pass
+
+    indices = _build_kjv_indices()
+    try:
+        with open(_INDEX_CACHE_PATH, 'wb') as f:
+            pickle.dump({'cache_key': cache_key, 'indices': indices}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # Cache writes are best-effort; the in-memory tables are complete.
+        pass
+    return indices
+
+
+_indices = _load_kjv_indices()
+book_order = _indices['book_order']
+book_chapter_count = _indices['book_chapter_count']
+chapter_verse_counts = _indices['chapter_verse_counts']
+cumulative_verses = _indices['cumulative_verses']
+strong_index = _indices['strong_index']
+strong_max_count = _indices['strong_max_count']
+del _indices
+
+# Canonical book order, resolved once for the heatmap page.
+ORDERED_BOOKS = [b for b, _ in sorted(book_order.items(), key=lambda x: x[1])]
+
+# First outline unit covering each chapter, per book, so the active-unit
+# lookup is a list index instead of a scan over the book's units.
+unit_by_chapter = {}
+for _book, _units in outline_data.items():
+    _slots = [None] * (book_chapter_count.get(_book, 0) + 1)
+    for _unit in _units:
+        _start_ch = int((_unit.get('range_start') or {}).get('chapter', 0) or 0)
+        _end_ch = int((_unit.get('range_end') or {}).get('chapter', 0) or 0)
+        for _ch in range(max(_start_ch, 1), min(_end_ch, len(_slots) - 1) + 1):
+            if _slots[_ch] is None:
+                _slots[_ch] = _unit
+    unit_by_chapter[_book] = _slots
+del _book, _units, _slots, _unit, _start_ch, _end_ch, _ch
+
+# Freeze the startup tables. With gunicorn --preload they are built once in
+# the master process; keeping them strictly read-only means no worker-side
+# write can trigger copy-on-write page duplication after fork.
+for _arr in chapter_verse_counts.values():
+    _arr.flags.writeable = False
+for _arr in cumulative_verses.values():
+    _arr.flags.writeable = False
+del _arr
+ORDERED_BOOKS = tuple(ORDERED_BOOKS)
+book_order = types.MappingProxyType(book_order)
+book_chapter_count = types.MappingProxyType(book_chapter_count)
+strong_index = types.MappingProxyType(strong_index)
+strong_max_count = types.MappingProxyType(strong_max_count)
+
+
+def _max_verse_in_chapter(book: str, chapter: int) -> int:
+    counts = chapter_verse_counts.get(book)
+    if counts is None or not 1 <= chapter < len(counts):
+        return 0
+    return int(counts[chapter])
+
+
+def _get_unit_color(unit: dict) -> str:
+    # crc32 is deterministic across processes (unlike hash()) and far cheaper
+    # than a cryptographic digest; we only need 24 bits of color.
+    seed = f"{unit.get('marker', '')}-{unit.get('title', '')}"
+    return f"#{zlib.crc32(seed.encode('utf-8')) & 0xFFFFFF:06x}"
+
+
+@functools.lru_cache(maxsize=8192)
+def _count_verses_in_range(book: str, start_chapter: int, start_verse: int, end_chapter: int, end_verse: int) -> int:
+    prefix = cumulative_verses.get(book)
+    if prefix is None or end_chapter < start_chapter:
+        return 0
+    if start_chapter == end_chapter:
+        if not _max_verse_in_chapter(book, start_chapter):
+            return 0
+        return max(0, end_verse - start_verse + 1)
+
+    total = 0
+    start_max = _max_verse_in_chapter(book, start_chapter)
+    if start_max:
+        total += max(0, start_max - start_verse + 1)
+    # Full chapters strictly between start and end come straight from the
+    # prefix sums; out-of-range chapters contribute zero either way.
+    last = len(prefix) - 1
+    total += int(prefix[min(end_chapter - 1, last)] - prefix[min(max(start_chapter, 0), last)])
+    if _max_verse_in_chapter(book, end_chapter):
+        total += max(0, end_verse)
+    return total
+
+
 def _calculate_unit_progress(unit: dict, book: str, chapter: int) -> float:
     start = unit.get('range_start') or {}
     end = unit.get('range_end') or {}
@@ -126,20 +339,38 @@ def _calculate_unit_progress(unit: dict, book: str, chapter: int) -> float:
     start_v = int(start.get('verse', 1) or 1)
     end_ch = int(end.get('chapter', 0) or 0)
     end_v = int(end.get('verse', 0) or 0)
-
-    total = _count_verses_in_range(book, start_ch, start_v, end_ch, end_v)
-    if not total:
-        return 0.0
-
-    current_max_verse = chapter_verse_counts.get(book, {}).get(chapter, 0)
-    current_end = end_v if (chapter == end_ch and end_v) else current_max_verse
+
+    total = unit.get('_total')
+    if total is None:
+        total = _count_verses_in_range(book, start_ch, start_v, end_ch, end_v)
+    if not total:
+        return 0.0
+
+    current_max_verse = _max_verse_in_chapter(book, chapter)
+    current_end = end_v if (chapter == end_ch and end_v) else current_max_verse
     completed = _count_verses_in_range(book, start_ch, start_v, chapter, current_end)
     return min(100.0, (completed / total) * 100)
 
+
+# Outline units are static, so stamp each one's color and total verse count
+# at startup instead of recomputing them on every render.
+for _book, _units in outline_data.items():
+    for _unit in _units:
+        _unit['_color'] = _get_unit_color(_unit)
+        _start = _unit.get('range_start') or {}
+        _end = _unit.get('range_end') or {}
+        _unit['_total'] = _count_verses_in_range(
+            _book,
+            int(_start.get('chapter', 0) or 0),
+            int(_start.get('verse', 1) or 1),
+            int(_end.get('chapter', 0) or 0),
+            int(_end.get('verse', 0) or 0),
+        )
+del _book, _units, _unit, _start, _end
+
 def _unit_bounds_for_chapter(unit: dict, book: str, chapter: int):
     """Return (start_verse, end_verse) for this unit within the current chapter."""
-    chapter_counts = chapter_verse_counts.get(book, {})
-    max_verse = chapter_counts.get(chapter, 0)
+    max_verse = _max_verse_in_chapter(book, chapter)
 
     start = unit.get('range_start') or {}
     end = unit.get('range_end') or {}
@@ -153,6 +384,9 @@ def _unit_bounds_for_chapter(unit: dict, book: str, chapter: int):
     return max(1, chapter_start), max(chapter_start, chapter_end)
 
 
+# Memoized like get_active_unit: outline data is static, and callers only
+# read the returned structures.
+@functools.lru_cache(maxsize=2048)
 def get_active_units(book: str, chapter: int):
     """Return all outline units that include the given chapter, with progress."""
     if not book or not chapter:
@@ -173,7 +407,7 @@ def get_active_units(book: str, chapter: int):
                 'label': label or unit.get('title') or 'Unit',
                 'range': unit.get('range'),
                 'percent_complete': _calculate_unit_progress(unit, book, chapter),
-                'color': _get_unit_color(unit),
+                'color': unit['_color'],
                 'start_verse': start_v,
                 'end_verse': end_v,
                 'marker': unit.get('marker', '').strip(),
@@ -188,31 +422,57 @@ def get_active_units(book: str, chapter: int):
     return active
 
 
+# Safe to memoize: outline data and verse counts are immutable after startup,
+# and the returned dict is only read by the templates.
+@functools.lru_cache(maxsize=2048)
 def get_active_unit(book: str, chapter: int):
     if not book or not chapter:
         return None
 
-    units = outline_data.get(book)
-    if not units:
+    slots = unit_by_chapter.get(book)
+    if not slots or not 1 <= chapter < len(slots):
+        return None
+    unit = slots[chapter]
+    if unit is None:
         return None
 
-    for unit in units:
-        start = unit.get('range_start') or {}
-        end = unit.get('range_end') or {}
-        start_ch = int(start.get('chapter', 0) or 0)
-        end_ch = int(end.get('chapter', 0) or 0)
-
-        if start_ch <= chapter <= end_ch:
-            label = f"{unit.get('marker', '').strip()} {unit.get('title', '').strip()}".strip()
-            percent = _calculate_unit_progress(unit, book, chapter)
-            return {
-                'label': label or unit.get('title'),
-                'range': unit.get('range'),
-                'percent_complete': percent,
-                'color': _get_unit_color(unit),
-            }
-
-    return None
+    label = f"{unit.get('marker', '').strip()} {unit.get('title', '').strip()}".strip()
+    return {
+        'label': label or unit.get('title'),
+        'range': unit.get('range'),
+        'percent_complete': _calculate_unit_progress(unit, book, chapter),
+        'color': unit['_color'],
+    }
+
+# Rendered-chapter cache. Transliteration output depends only on the book,
+# chapter and the user's Strong's dict, so identical requests (the common
+# case: users stepping through chapters with an unmodified dict) reuse the
+# finished HTML. Bounded FIFO eviction keeps memory predictable.
+_chapter_render_cache = {}
+_CHAPTER_RENDER_CACHE_MAX = 256
+
+
+def _user_dict_digest(user_dict: dict) -> str:
+    if orjson is not None:
+        blob = orjson.dumps(user_dict, option=orjson.OPT_SORT_KEYS)
+    else:
+        blob = json.dumps(user_dict, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _render_chapter(book: str, chapter: int, user_strongs_dict: dict, active_units):
+    key = (book, chapter, _user_dict_digest(user_strongs_dict))
+    cached = _chapter_render_cache.get(key)
+    if cached is not None:
+        return cached
+    result = transliterate_chapter(
+        book, chapter, user_strongs_dict, strongs_data, kjv_data, active_units=active_units
+    )
+    if len(_chapter_render_cache) >= _CHAPTER_RENDER_CACHE_MAX:
+        _chapter_render_cache.pop(next(iter(_chapter_render_cache)))
+    _chapter_render_cache[key] = result
+    return result
+
 
 DEFAULT_CONTEXT_OPTIONS = {
     'bolded': True,
@@ -234,16 +494,16 @@ def home():
     if chapter_str:
         try:
             chapter = int(chapter_str)
-        except ValueError:
-            chapter = None
-
+        except ValueError:
+            chapter = None
+
     active_units = get_active_units(book, chapter) if book and chapter else []
     result = ""
     active_unit = None
     if request.method == 'POST' or (book and chapter):
         if book and chapter:
             user_strongs_dict = get_user_strongs_dict()
-            result = transliterate_chapter(book, chapter, user_strongs_dict, strongs_data, kjv_data, active_units=active_units)
+            result = _render_chapter(book, chapter, user_strongs_dict, active_units)
             active_unit = get_active_unit(book, chapter)
 
     total_chapters = book_chapter_count.get(book)
@@ -268,23 +528,23 @@ def home():
 @app.route('/navigate', methods=['POST'])
 def navigate():
     book = request.form.get('book', '')
-    chapter_str = request.form.get('chapter', '')
-    try:
-        chapter = int(chapter_str)
-    except ValueError:
-        chapter = 1
-    direction = request.form.get('direction', '')
-
-    if direction == 'next':
-        chapter += 1
-    elif direction == 'prev':
-        chapter = max(1, chapter - 1)
-
+    chapter_str = request.form.get('chapter', '')
+    try:
+        chapter = int(chapter_str)
+    except ValueError:
+        chapter = 1
+    direction = request.form.get('direction', '')
+
+    if direction == 'next':
+        chapter += 1
+    elif direction == 'prev':
+        chapter = max(1, chapter - 1)
+
     # Here you might want to add logic to handle book transitions
 
     active_units = get_active_units(book, chapter)
-    user_strongs_dict = session.get('user_strongs_dict', default_strongs_dict)
-    result = transliterate_chapter(book, chapter, user_strongs_dict, strongs_data, kjv_data, active_units=active_units)
+    user_strongs_dict = get_user_strongs_dict()
+    result = _render_chapter(book, chapter, user_strongs_dict, active_units)
     active_unit = get_active_unit(book, chapter)
     total_chapters = book_chapter_count.get(book)
     book_progress = (chapter / total_chapters * 100) if total_chapters and chapter else None
@@ -311,33 +571,37 @@ def build_verses_for_render(result_html: str, active_units: list):
     if not result_html:
         return []
 
+    # Materialize the bar list for each verse number up front so the
+    # per-line work below is a single dict lookup instead of re-scanning
+    # active_units for every verse.
+    bars_by_verse_num = {}
+    for unit in active_units:
+        start_verse = unit.get('start_verse', 1)
+        end_verse = unit.get('end_verse', 0)
+        for num in range(start_verse, end_verse + 1):
+            bars_by_verse_num.setdefault(num, []).append({
+                'color': unit['color'],
+                'label': unit['label'],
+                'marker': unit.get('marker'),
+                'is_start': num == start_verse,
+                'is_end': num == end_verse,
+                'start_verse': start_verse,
+                'end_verse': end_verse,
+            })
+
     verses = []
-    for line in result_html.split('\n'):
-        if not line.strip():
+    for line in result_html.splitlines():
+        num_str, sep, text_html = line.partition(' ')
+        if not num_str:
             continue
-        parts = line.split(' ', 1)
         try:
-            num = int(parts[0])
-        except (ValueError, IndexError):
+            num = int(num_str)
+        except ValueError:
             continue
-        text_html = parts[1] if len(parts) > 1 else ''
-        bars = [
-            {
-                'color': unit['color'],
-                'label': unit['label'],
-                'marker': unit.get('marker'),
-                'is_start': num == unit.get('start_verse', 1),
-                'is_end': num == unit.get('end_verse', 0),
-                'start_verse': unit.get('start_verse', 1),
-                'end_verse': unit.get('end_verse', 0),
-            }
-            for unit in active_units
-            if num >= unit.get('start_verse', 1) and num <= unit.get('end_verse', 0)
-        ]
-        verses.append({'num': num, 'html': text_html, 'bars': bars})
+        verses.append({'num': num, 'html': text_html, 'bars': bars_by_verse_num.get(num, [])})
     return verses
-
-# Route for handling the user's strongs_dict
+
+# Route for handling the user's strongs_dict
 @app.route('/edit_dict', methods=['GET', 'POST'])
 def edit_dict():
     user_strongs_dict = get_user_strongs_dict()
@@ -417,7 +681,11 @@ def edit_dict():
         save_user_dict(user_strongs_dict)
         return jsonify({"success": True})
     
-    sorted_dict = dict(sorted(user_strongs_dict.items(), key=lambda x: int(x[0][1:])))
+    if user_strongs_dict.keys() == _DEFAULT_USER_STRONGS.keys():
+        # Unmodified key set: reuse the order computed at startup.
+        sorted_dict = {k: user_strongs_dict[k] for k in _DEFAULT_SORTED_KEYS}
+    else:
+        sorted_dict = {k: user_strongs_dict[k] for k in sorted(user_strongs_dict, key=_strongs_sort_key)}
 
     # For GET requests, render the edit page
     return render_template(
@@ -433,9 +701,10 @@ def upload_dict():
     file = request.files.get('dict_file')
     if not file or not file.filename:
         return redirect(url_for('edit_dict', upload_error="Please choose a JSON file to upload."))
+    raw = file.stream.read()
     try:
-        data = json.load(file.stream)
-    except json.JSONDecodeError:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
         return redirect(url_for('edit_dict', upload_error="Invalid JSON. Please upload a valid my_strongs_dict JSON file."))
 
     valid, message = _validate_user_dict(data)
@@ -444,69 +713,97 @@ def upload_dict():
 
     save_user_dict(data)
     return redirect(url_for('edit_dict', upload_success="Custom Strong's list uploaded and saved."))
-
-# Route for exporting your current list
-@app.route('/export_dict')
-def export_dict():
-    user_strongs_dict = session.get('user_strongs_dict', default_strongs_dict.copy())
-    
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as temp_file:
-        json.dump(user_strongs_dict, temp_file, indent=2)
-    
-    # Send the file
-    return send_file(temp_file.name, as_attachment=True, download_name='my_strongs_dict.json')
-
-@app.route('/about')
-def about():
-    return render_template('about.html')
-
-
+
+# Route for exporting your current list
+@app.route('/export_dict')
+def export_dict():
+    user_strongs_dict = get_user_strongs_dict()
+
+    # Serialize straight into memory; the old temp file was never cleaned up.
+    buf = io.BytesIO(_dump_json_bytes(user_strongs_dict))
+    return send_file(
+        buf,
+        mimetype='application/json',
+        as_attachment=True,
+        download_name='my_strongs_dict.json',
+    )
+
+@app.route('/about')
+def about():
+    return render_template('about.html')
+
+
+# Endpoints whose output is identical for every user; /about is static and a
+# heatmap depends only on the ?strong= query string, so clients and CDNs can
+# revalidate with 304s instead of re-rendering.
+_CACHEABLE_ENDPOINTS = {'about', 'heatmap'}
+
+
+@app.after_request
+def _add_cache_headers(response):
+    if request.endpoint in _CACHEABLE_ENDPOINTS and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = 600
+        response.add_etag()
+        return response.make_conditional(request)
+    return response
+
+
 def generate_heatmap(strong_number):
     strong = (strong_number or '').strip('{}').upper()
     if not strong:
         return {}
+    return _generate_heatmap(strong)
 
-    counts = {}
-    max_count = 0
-    verses_by_book = get_verses_by_book(kjv_data)
-    for book, verses in verses_by_book.items():
-        chapter_groups = {}
-        for verse in verses:
-            ch = int(verse.get('chapter', 0) or 0)
-            chapter_groups.setdefault(ch, []).append(verse)
-
-        counts[book] = {}
-        for ch, verses_in_chapter in chapter_groups.items():
-            chapter_counts = count_strongs_in_verses(verses_in_chapter, allowed={strong})
-            cnt = chapter_counts.get(strong, 0)
-            counts[book][ch] = cnt
-            if cnt > max_count:
-                max_count = cnt
+
+# White-to-red ramp for heatmap cells, precomputed so per-cell work is a
+# single list index instead of three f-string hex conversions.
+_HEAT_COLORS = ['#ff%02x%02x' % (v, v) for v in range(256)]
+
+# Shared all-white rows for books with zero hits — the common case (e.g. a
+# Greek Strong's number never appears in the OT), so no per-request
+# allocation for two thirds of the grid.
+_EMPTY_HEAT_ROWS = {
+    book: [{'count': 0, 'color': _HEAT_COLORS[255], 'chapter': ch}
+           for ch in range(1, book_chapter_count.get(book, 0) + 1)]
+    for book in book_order
+}
+
+
+# Cached on the normalized Strong's number; the rows are read-only in the
+# template, so sharing the dict between requests is safe.
+@functools.lru_cache(maxsize=2048)
+def _generate_heatmap(strong):
+    counts = strong_index.get(strong, {})
+    max_count = strong_max_count.get(strong, 0)
 
     heatmap = {}
     for book in book_order:
+        chapters = counts.get(book)
+        if not chapters:
+            heatmap[book] = _EMPTY_HEAT_ROWS[book]
+            continue
         max_chapter = book_chapter_count.get(book, 0)
-        row = []
-        chapters = counts.get(book, {})
-        for ch in range(1, max_chapter + 1):
-            cnt = chapters.get(ch, 0)
-            alpha = (cnt / max_count) if max_count else 0
-            r = 255
-            g = int(255 * (1 - alpha))
-            b = int(255 * (1 - alpha))
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            row.append({'count': cnt, 'color': color, 'chapter': ch})
-        heatmap[book] = row
+        counts_arr = np.zeros(max_chapter + 1, dtype=np.int32)
+        for ch, cnt in chapters.items():
+            if ch <= max_chapter:
+                counts_arr[ch] = cnt
+        # Vectorized ramp levels for the whole book; truncation matches the
+        # old per-cell int() conversion.
+        levels = (255 * (1 - counts_arr / max_count)).astype(np.intp) if max_count \
+            else np.full(max_chapter + 1, 255, dtype=np.intp)
+        heatmap[book] = [
+            {'count': int(counts_arr[ch]), 'color': _HEAT_COLORS[levels[ch]], 'chapter': ch}
+            for ch in range(1, max_chapter + 1)
+        ]
 
     return heatmap
-
-
-@app.route('/heatmap')
-def heatmap():
-    strong = request.args.get('strong', '').strip()
-    data = None
-    if strong:
-        data = generate_heatmap(strong)
-    ordered_books = [b for b, _ in sorted(book_order.items(), key=lambda x: x[1])]
-    return render_template('heatmap.html', strong=strong, data=data, ordered_books=ordered_books)
+
+
+@app.route('/heatmap')
+def heatmap():
+    strong = request.args.get('strong', '').strip()
+    data = None
+    if strong:
+        data = generate_heatmap(strong)
+    return render_template('heatmap.html', strong=strong, data=data, ordered_books=ORDERED_BOOKS)
@@ -1,25 +1,106 @@
 # Description: This script is used to replace words with their respective transliterations.
 import re
+import bisect
+import functools
+import heapq
 import html
+import sys
 import colorsys
 import hashlib
 import unicodedata
 from collections import Counter
 
-STRONGS_REGEX = re.compile(r'{([HG]\d+)}')
+# Strong's markers are pure ASCII, so compile the marker-only patterns with
+# re.ASCII to keep \d out of the Unicode digit tables.
+STRONGS_REGEX = re.compile(r'{([HG]\d+)}', re.ASCII)
+
+_NON_LETTERS = re.compile(r"[^A-Za-z']")
+
+_ENGLISH_STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "but", "by", "for", "from", "he", "her",
+    "his", "i", "in", "is", "it", "nor", "not", "of", "on", "or", "our",
+    "she", "so", "that", "the", "their", "them", "then", "they", "this",
+    "those", "to", "was", "we", "were", "when", "which", "who", "with",
+    "you", "your",
+})
+_MIN_ENGLISH_HIGHLIGHT_LENGTH = 4
+
+
+@functools.lru_cache(maxsize=4096)
+def _should_skip_english_highlight(display_text):
+    """True when an untransliterated display word is too short or too common
+    to deserve a repeat highlight. Cached — the same words recur across
+    verses and chapters."""
+    normalized = _NON_LETTERS.sub("", display_text).lower()
+    return (
+        len(normalized) < _MIN_ENGLISH_HIGHLIGHT_LENGTH
+        or normalized in _ENGLISH_STOPWORDS
+    )
+
+# One cleanup pattern for every leftover marker form — {H123}, {(H123)} and
+# the malformed {H123)} — so each verse is scanned once instead of three times.
+_CLEAN_MARKERS = re.compile(r'\{(?:[HG]\d+|\([HG]\d+\)|[HG]\d+\))\}', re.ASCII)
+
+# Compiled per-Strong's-number patterns, cached for the life of the process;
+# the vocabulary is finite (~14k numbers) so the caches stay bounded.
+_WORD_TOKEN_PATTERNS = {}
+_PHRASE_PATTERNS = {}
+
+
+def _word_token_patterns(strongs_number):
+    pats = _WORD_TOKEN_PATTERNS.get(strongs_number)
+    if pats is None:
+        # Strong's numbers are [HG] plus digits — no regex metacharacters —
+        # so they can be spliced into the pattern without re.escape.
+        word_re = re.compile(r'\b([\w\']*)\{' + strongs_number + r'\}')
+        alt_re = re.compile(r'\{' + strongs_number + r"\}'\{[HG]\d+\}", re.ASCII)
+        pats = _WORD_TOKEN_PATTERNS[strongs_number] = (word_re, alt_re)
+    return pats
+
+
+def _phrase_pattern(strongs_number, translation):
+    key = (strongs_number, translation)
+    pat = _PHRASE_PATTERNS.get(key)
+    if pat is None:
+        # Group 1 captures the phrase as it appears in the verse, saving the
+        # caller a split/strip round-trip on every match.
+        pat = _PHRASE_PATTERNS[key] = re.compile(
+            r'\b(' + re.escape(translation) + r')\s*\{' + strongs_number + r'\}',
+            re.IGNORECASE,
+        )
+    return pat
+
+
 _global_strongs_counts = None
 _verses_by_book = None
+_verses_by_chapter = None
+_verse_keys_by_book = {}
 
 
 def extract_strongs_numbers(text: str):
-    return STRONGS_REGEX.findall(text or '')
+    # Interning collapses the many duplicate number strings across verse
+    # token lists into shared objects, so the dict and set probes downstream
+    # start with a pointer comparison.
+    return [sys.intern(sn) for sn in STRONGS_REGEX.findall(text or '')]
+
+
+def get_verse_strongs(verse: dict):
+    """Return the verse's Strong's tokens, caching them on the verse dict.
+
+    Verse dicts live for the life of the process, so each verse is only
+    ever regex-scanned once no matter how many requests touch it.
+    """
+    tokens = verse.get('_strongs')
+    if tokens is None:
+        tokens = verse['_strongs'] = extract_strongs_numbers(verse.get('text', ''))
+    return tokens
 
 
 def count_strongs_in_verses(verses, allowed=None):
     allowed_set = set(allowed) if allowed else None
     counts = Counter()
     for verse in verses or []:
-        matches = extract_strongs_numbers(verse.get('text', ''))
+        matches = get_verse_strongs(verse)
         if allowed_set is not None:
             matches = [m for m in matches if m in allowed_set]
         counts.update(matches)
@@ -42,6 +123,16 @@ def get_verses_by_book(kjv_data):
     return _verses_by_book
 
 
+def get_verses_by_chapter(kjv_data):
+    global _verses_by_chapter
+    if _verses_by_chapter is None:
+        _verses_by_chapter = {}
+        for verse in kjv_data.get('verses', []):
+            key = (verse.get('book_name'), int(verse.get('chapter', 0)))
+            _verses_by_chapter.setdefault(key, []).append(verse)
+    return _verses_by_chapter
+
+
 def _unit_bounds(unit: dict):
     start = unit.get('range_start', {})
     end = unit.get('range_end', {})
@@ -59,18 +150,19 @@ def _verses_for_unit(kjv_data, book: str, unit: dict):
     if not start_ch or not end_ch:
         return []
 
-    selected = []
-    for verse in book_verses:
-        ch = int(verse.get('chapter', 0))
-        vs = int(verse.get('verse', 0))
-        if ch < start_ch or ch > end_ch:
-            continue
-        if ch == start_ch and vs < start_v:
-            continue
-        if ch == end_ch and end_v and vs > end_v:
-            continue
-        selected.append(verse)
-    return selected
+    # Each book's verses are in canonical (chapter, verse) order, so a unit
+    # is a contiguous slice; two bisects replace the full-book scan.
+    keys = _verse_keys_by_book.get(book)
+    if keys is None:
+        keys = _verse_keys_by_book[book] = [
+            (verse['chapter'], verse['verse']) for verse in book_verses
+        ]
+    lo = bisect.bisect_left(keys, (start_ch, start_v))
+    if end_v:
+        hi = bisect.bisect_right(keys, (end_ch, end_v))
+    else:
+        hi = bisect.bisect_left(keys, (end_ch + 1, 0))
+    return book_verses[lo:hi]
 
 
 def _rule_global_rare(ctx):
@@ -106,13 +198,50 @@ def classify_uncommon(context: dict) -> dict:
         'unit_peak': context.get('unit_peak', 0),
     }
 
+_VOWELS = re.compile(r'[AEIOUaeiou]')
+
+
+def _strip_diacritics(text: str) -> str:
+    normalized = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+@functools.lru_cache(maxsize=8192)
+def _consonant_key(text: str) -> str:
+    """Uppercase consonant skeleton of a lemma/xlit, cached — the Unicode
+    normalization is the priciest step in metadata building and its inputs
+    are a fixed vocabulary."""
+    letters_only = ''.join(ch for ch in _strip_diacritics(text) if ch.isalpha())
+    return _VOWELS.sub('', letters_only).upper()
+
+
+def _derive_root(entry: dict, fallback_xlit: str = '') -> str:
+    if not isinstance(entry, dict):
+        entry = {}
+    root = _consonant_key(entry.get('lemma', '') or '')
+    if not root:
+        root = _consonant_key(fallback_xlit or entry.get('xlit', ''))
+    return root[:6]
+
+
+@functools.lru_cache(maxsize=16384)
+def _escape_attr(val) -> str:
+    """html.escape with caching — span metadata (xlit, lemma, descriptions,
+    verse words) draws from a fixed vocabulary, so each value is only ever
+    escaped once per process."""
+    if val is None:
+        return ''
+    return html.escape(str(val), quote=True)
+
+
+@functools.lru_cache(maxsize=512)
 def is_light_color(hex_color):
-    # Convert hex to RGB
-    rgb = tuple(int(hex_color[i:i+2], 16) / 255 for i in (1, 3, 5))
-    # Convert RGB to HSL
-    h, l, s = colorsys.rgb_to_hls(*rgb)
-    # Check if the color is light (you can adjust the threshold)
-    return l > 0.65
+    r = int(hex_color[1:3], 16)
+    g = int(hex_color[3:5], 16)
+    b = int(hex_color[5:7], 16)
+    # HLS lightness is just (max + min) / 2 — the only part of the full
+    # colorsys conversion this check ever used.
+    return (max(r, g, b) + min(r, g, b)) / 510 > 0.65
 
 
 def hls_to_hex(h, l, s):
@@ -120,8 +249,11 @@ def hls_to_hex(h, l, s):
     return '#{:02x}{:02x}{:02x}'.format(int(r * 255), int(g * 255), int(b * 255))
 
 
+@functools.lru_cache(maxsize=4096)
 def generate_repeat_colors(strongs_number):
-    digest = hashlib.sha256(strongs_number.encode('utf-8')).digest()
+    # blake2b with a tiny digest is cheaper than SHA-256 and three bytes of
+    # stable entropy is all the palette needs.
+    digest = hashlib.blake2b(strongs_number.encode('utf-8'), digest_size=4).digest()
     hue = digest[0] / 255
     saturation = 0.35 + (digest[1] / 255) * 0.2
     lightness = 0.35 + (digest[2] / 255) * 0.15
@@ -131,6 +263,18 @@ def generate_repeat_colors(strongs_number):
     accent_color = hls_to_hex(hue, accent_lightness, accent_saturation)
     return base_color, accent_color
 
+@functools.lru_cache(maxsize=1024)
+def _base_style(base_color):
+    text_color = '#ffffff' if not is_light_color(base_color[1:]) else '#000000'
+    return f"background-color: {base_color}; color: {text_color};"
+
+
+@functools.lru_cache(maxsize=4096)
+def _repeat_style(strongs_number):
+    repeat_color, shadow_color = generate_repeat_colors(strongs_number)
+    return f"color: #1f0f0b; background-color: {shadow_color}; border: 1px solid {repeat_color};"
+
+
 def transliterate_chapter(
     book, chapter, strongs_dict_path, strongs_path, kjv_path, max_repeated_highlights=10, active_units=None
 ):
@@ -146,44 +290,29 @@ def transliterate_chapter(
         "G2532", "G1161", "G1510", "G3588", "G2532", "G3754", "G3777", "G1063",
         "G1223", "G2531", "G1722", "G1519", "G1909", "G3326", "G3756", "G1163",
     }
-    english_stopwords = {
-        "a", "an", "and", "as", "at", "but", "by", "for", "from", "he", "her",
-        "his", "i", "in", "is", "it", "nor", "not", "of", "on", "or", "our",
-        "she", "so", "that", "the", "their", "them", "then", "they", "this",
-        "those", "to", "was", "we", "were", "when", "which", "who", "with",
-        "you", "your",
-    }
-    min_english_highlight_length = 4
     min_repeat_count = 3
 
-    def strip_diacritics(text: str) -> str:
-        normalized = unicodedata.normalize('NFKD', text or '')
-        return ''.join(ch for ch in normalized if not unicodedata.combining(ch))
-
-    def consonant_key(text: str) -> str:
-        letters_only = ''.join(ch for ch in strip_diacritics(text) if ch.isalpha())
-        return re.sub(r'[AEIOUaeiou]', '', letters_only).upper()
-
-    def derive_root(entry: dict, fallback_xlit: str = '') -> str:
-        if not isinstance(entry, dict):
-            entry = {}
-        root = consonant_key(entry.get('lemma', '') or '')
-        if not root:
-            root = consonant_key(fallback_xlit or entry.get('xlit', ''))
-        return root[:6]
-
-    def safe_attr(val) -> str:
-        if val is None:
-            return ''
-        return html.escape(str(val), quote=True)
-
-    chapter_data = [{
-        'text': verse['text'],
-        'strongs': extract_strongs_numbers(verse['text']),
-        'verse': str(verse['verse'])
-    }
-    for verse in kjv_path['verses']
-    if verse['book_name'] == book and verse['chapter'] == int(chapter)] #and verse['verse'] == int(verse_num)]
+    safe_attr = _escape_attr
+
+    chapter_verses = get_verses_by_chapter(kjv_path).get((book, int(chapter)), [])
+    # Build the working verse dicts and tally Strong's occurrences in the
+    # same pass instead of re-walking the chapter with a Counter afterwards.
+    chapter_data = []
+    strongs_counter = {}
+    for verse in chapter_verses:
+        tokens = get_verse_strongs(verse)
+        # Like the token lists, the display string for the verse number is
+        # formatted once and cached on the long-lived verse dict.
+        vstr = verse.get('_vstr')
+        if vstr is None:
+            vstr = verse['_vstr'] = str(verse['verse'])
+        chapter_data.append({
+            'text': verse['text'],
+            'strongs': tokens,
+            'verse': vstr,
+        })
+        for sn in tokens:
+            strongs_counter[sn] = strongs_counter.get(sn, 0) + 1
 
     for strongs_number in strongs_dict_path:
         strong_entry = strongs_lookup.get(strongs_number, {})
@@ -196,30 +325,24 @@ def transliterate_chapter(
                 'lemma': strong_entry.get('lemma') or '',
                 'pronounce': strong_entry.get('pronounce') or '',
                 'description': strong_entry.get('description') or '',
-                'root': derive_root(strong_entry, xlit_value),
+                'root': _derive_root(strong_entry, xlit_value),
             }
 
-    strongs_counter = Counter(
-        sn
-        for verse in chapter_data
-        for sn in verse['strongs']
-    )
     repeated_candidates = [
         (num, count)
         for num, count in strongs_counter.items()
         if count >= min_repeat_count and num not in stop_strongs
     ]
-    repeated_sorted = sorted(repeated_candidates, key=lambda item: (-item[1], item[0]))
+    # Only the top few winners matter, so take them with a bounded heap
+    # instead of sorting the whole candidate list.
     repeated_strongs = {
-        num for num, _ in repeated_sorted[:max_repeated_highlights]
+        num
+        for num, _ in heapq.nsmallest(
+            max_repeated_highlights, repeated_candidates, key=lambda item: (-item[1], item[0])
+        )
     }
-    repeated_colors = {num: generate_repeat_colors(num) for num in repeated_strongs}
 
-    chapter_strongs_set = {
-        sn
-        for verse in chapter_data
-        for sn in verse['strongs']
-    }
+    chapter_strongs_set = set(strongs_counter)
     global_strongs_counts = get_global_strongs_counts(kjv_path)
     unit_max_counts = {}
     if active_units and chapter_strongs_set:
@@ -243,22 +366,12 @@ def transliterate_chapter(
         }
         uncommon_lookup[num] = classify_uncommon(context)
 
-    def should_skip_english_highlight(display_text, has_transliteration):
-        if has_transliteration:
-            return False
-
-        normalized = re.sub(r"[^A-Za-z']", "", display_text).lower()
-        return (
-            len(normalized) < min_english_highlight_length
-            or normalized in english_stopwords
-        )
-
     def build_span(strongs_number, display_text, original_text, base_color, has_transliteration, metadata=None, uncommon_meta=None):
         is_uncommon = bool(has_transliteration and uncommon_meta and uncommon_meta.get('is_uncommon'))
         tag_name = "button" if is_uncommon else "span"
         classes = ["strongs-token"]
         data_original_attr = (
-            f' data-original="{html.escape(original_text)}"' if has_transliteration else ""
+            f' data-original="{_escape_attr(original_text)}"' if has_transliteration else ""
         )
 
         if has_transliteration:
@@ -299,63 +412,84 @@ def transliterate_chapter(
         style_parts = []
 
         if base_color and has_transliteration:
-            text_color = '#ffffff' if not is_light_color(base_color[1:]) else '#000000'
-            style_parts.append(f"background-color: {base_color}; color: {text_color};")
+            style_parts.append(_base_style(base_color))
 
-        if has_transliteration and strongs_number in repeated_colors:
+        if has_transliteration and strongs_number in repeated_strongs:
             classes.append("repeated")
-            repeat_color, shadow_color = repeated_colors[strongs_number]
-            style_parts.append(
-                f"color: #1f0f0b; background-color: {shadow_color}; border: 1px solid {repeat_color};",
-            )
+            style_parts.append(_repeat_style(strongs_number))
 
         style_attr = f' style="{" ".join(style_parts)}"' if style_parts else ''
         type_attr = ' type="button"' if tag_name == "button" else ""
         return f'<{tag_name} class="{" ".join(classes)}"{data_original_attr}{data_attr_str}{style_attr}{type_attr}>{display_text}</{tag_name}>'
     #----------------------------------------------------------------------
+    meta_cache = {}
+
+    def base_meta(strongs_number, display_value, xlit_info, strongs_meta):
+        # The coalesced fields are fixed per (number, display) pair, so
+        # build them once per chapter; only the gloss varies per token.
+        key = (strongs_number, display_value)
+        cached = meta_cache.get(key)
+        if cached is None:
+            cached = meta_cache[key] = {
+                'xlit': (xlit_info.get('xlit') if xlit_info else '') or strongs_meta.get('xlit'),
+                'lemma': (xlit_info.get('lemma') if xlit_info else '') or strongs_meta.get('lemma'),
+                'pronounce': (xlit_info.get('pronounce') if xlit_info else '') or strongs_meta.get('pronounce'),
+                'description': (xlit_info.get('description') if xlit_info else '') or strongs_meta.get('description'),
+                'root': (xlit_info.get('root') if xlit_info else '') or _derive_root(strongs_meta, display_value),
+            }
+        return cached
+
     result = []
+    sorted_translations_by_number = {}
     for verse in chapter_data:
         for strongs_number in verse['strongs']:
-            match = re.search(r'\b([\w\']*)\{' + re.escape(strongs_number) + r'\}', verse['text'])
-            alt_match = re.search(r'{' + re.escape(strongs_number) + r'\}\'{[HG]\d+}', verse['text'])
+            # Every pattern below requires the braced token, so once a
+            # replacement has consumed it (duplicate tokens, phrase matches)
+            # the remaining regex scans for this number are dead work.
+            braced = '{' + strongs_number + '}'
+            if braced not in verse['text']:
+                continue
+            word_re, alt_re = _word_token_patterns(strongs_number)
+            match = word_re.search(verse['text'])
+            alt_match = alt_re.search(verse['text'])
             if alt_match:
-                strongs_group = alt_match.group(1)
-                verse['text'] = verse['text'].replace(f"{{{strongs_number}}}", "")
+                verse['text'] = verse['text'].replace(braced, "")
                 continue
             if match:
                 word = match.group(1)
                 strongs_entry = strongs_dict_path.get(strongs_number, {})
                 strongs_meta = strongs_lookup.get(strongs_number, {}) or {}
-                translations = strongs_entry.get("translations", [word])
-                sorted_translations = sorted(translations, key=lambda x: len(x.split()), reverse=True)
+                if "translations" in strongs_entry:
+                    # Longest-phrase-first order and lowercasing are fixed per
+                    # number, so compute them once per chapter, not per token.
+                    sorted_translations = sorted_translations_by_number.get(strongs_number)
+                    if sorted_translations is None:
+                        sorted_translations = sorted_translations_by_number[strongs_number] = [
+                            t.lower()
+                            for t in sorted(strongs_entry["translations"], key=lambda x: len(x.split()), reverse=True)
+                        ]
+                else:
+                    sorted_translations = (word.lower(),)
                 xlit_info = replacement_mapping.get(strongs_number)
 
                 replaced = False
                 for translation in sorted_translations:
-                    translation = translation.lower()
-                    num_words_translation = len(translation.split())
-
                     # Look for the full phrase
-                    phrase_match = re.search(r'\b' + re.escape(translation) + r'\s*\{' + re.escape(strongs_number) + r'\}', verse['text'], re.IGNORECASE)
+                    phrase_match = _phrase_pattern(strongs_number, translation).search(verse['text'])
 
                     if phrase_match:
                         matched_text = phrase_match.group(0)
-                        matched_phrase = matched_text.split("{")[0].strip()
-                        display_value = html.escape(xlit_info['xlit']) if xlit_info else html.escape(matched_phrase)
-                        color = xlit_info['color'] if xlit_info else strongs_entry.get("color")
-                        meta = {
-                            'xlit': (xlit_info.get('xlit') if xlit_info else '') or strongs_meta.get('xlit'),
-                            'lemma': (xlit_info.get('lemma') if xlit_info else '') or strongs_meta.get('lemma'),
-                            'pronounce': (xlit_info.get('pronounce') if xlit_info else '') or strongs_meta.get('pronounce'),
-                            'description': (xlit_info.get('description') if xlit_info else '') or strongs_meta.get('description'),
-                            'root': (xlit_info.get('root') if xlit_info else '') or derive_root(strongs_meta, display_value),
-                            'gloss': matched_phrase,
-                        }
-                        if should_skip_english_highlight(display_value, bool(xlit_info)) and strongs_number in repeated_strongs:
-                            verse['text'] = verse['text'].replace(matched_text, matched_text.split("{")[0].strip())
+                        matched_phrase = phrase_match.group(1).strip()
+                        display_value = _escape_attr(xlit_info['xlit']) if xlit_info else _escape_attr(matched_phrase)
+                        # Membership test first: it is far cheaper than the
+                        # regex normalization inside the skip helper.
+                        if strongs_number in repeated_strongs and not xlit_info and _should_skip_english_highlight(display_value):
+                            verse['text'] = verse['text'].replace(matched_text, matched_phrase)
                             replaced = True
                             break
 
+                        color = xlit_info['color'] if xlit_info else strongs_entry.get("color")
+                        meta = {**base_meta(strongs_number, display_value, xlit_info, strongs_meta), 'gloss': matched_phrase}
                         replacement = build_span(
                             strongs_number,
                             display_value,
@@ -371,20 +505,13 @@ def transliterate_chapter(
 
                 # If no phrase match found, fall back to single word replacement
                 if not replaced:
-                    display_value = html.escape(xlit_info['xlit']) if xlit_info else html.escape(word)
-                    color = xlit_info['color'] if xlit_info else strongs_entry.get("color")
-                    meta = {
-                        'xlit': (xlit_info.get('xlit') if xlit_info else '') or strongs_meta.get('xlit'),
-                        'lemma': (xlit_info.get('lemma') if xlit_info else '') or strongs_meta.get('lemma'),
-                        'pronounce': (xlit_info.get('pronounce') if xlit_info else '') or strongs_meta.get('pronounce'),
-                        'description': (xlit_info.get('description') if xlit_info else '') or strongs_meta.get('description'),
-                        'root': (xlit_info.get('root') if xlit_info else '') or derive_root(strongs_meta, display_value),
-                        'gloss': word,
-                    }
-                    if should_skip_english_highlight(display_value, bool(xlit_info)) and strongs_number in repeated_strongs:
-                        verse['text'] = verse['text'].replace(word + f"{{{strongs_number}}}", word)
+                    display_value = _escape_attr(xlit_info['xlit']) if xlit_info else _escape_attr(word)
+                    if strongs_number in repeated_strongs and not xlit_info and _should_skip_english_highlight(display_value):
+                        verse['text'] = verse['text'].replace(word + braced, word)
                         continue
 
+                    color = xlit_info['color'] if xlit_info else strongs_entry.get("color")
+                    meta = {**base_meta(strongs_number, display_value, xlit_info, strongs_meta), 'gloss': word}
                     replacement = build_span(
                         strongs_number,
                         display_value,
@@ -394,9 +521,7 @@ def transliterate_chapter(
                         meta,
                         uncommon_lookup.get(strongs_number),
                     )
-                    verse['text'] = verse['text'].replace(word + f"{{{strongs_number}}}", replacement)
-        verse['text'] = re.sub(r'\{[HG]\d+\}', '', verse['text'])
-        verse['text'] = re.sub(r'\{(\([HG]\d+\))\}', '', verse['text'])
-        verse['text'] = re.sub(r'\{[HG]\d+\)\}', '', verse['text'])
+                    verse['text'] = verse['text'].replace(word + braced, replacement)
+        verse['text'] = _CLEAN_MARKERS.sub('', verse['text'])
         result.append(f"{verse['verse']} {verse['text']}")
     return '\n'.join(result)